@@ -0,0 +1,418 @@
+import os
+import stat
+import shutil
+import posixpath
+import queue
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional dependencies, only needed by the matching backend
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from s3transfer.manager import TransferManager
+except ImportError:
+    boto3 = None
+
+
+class DestinationBackend(object):
+    """
+    Base class of the places a delivery can be sent to.
+    Subclasses implement put_file and the folder helpers, uploads are run concurrently.
+    """
+
+    is_local = False
+    # False if two names differing only by case are the same file
+    case_sensitive = True
+
+    def __init__(self, workers=1):
+        """
+        Args:
+            workers (int): Number of files uploaded at the same time.
+        """
+        self.workers = max(1, workers)
+
+    def normpath(self, path):
+        return path.replace('\\', '/')
+
+    def join(self, *parts):
+        return posixpath.join(*parts)
+
+    def basename(self, path):
+        return posixpath.basename(path.rstrip('/'))
+
+    def get_root(self, project_path):
+        """
+        Return the folder the deliveries are sent to.
+
+        Args:
+            project_path (str): Current Prism project path.
+
+        Returns:
+            str: Destination root path.
+        """
+        raise NotImplementedError
+
+    def list_folders(self, path):
+        """
+        Return the names of the folders directly under path.
+        """
+        raise NotImplementedError
+
+    def makedirs(self, path):
+        raise NotImplementedError
+
+    def put_file(self, src, dst):
+        """
+        Copy a local file to the destination.
+
+        Args:
+            src (str): Local source file path.
+            dst (str): Destination file path.
+        """
+        raise NotImplementedError
+
+    def copy_folder_stat(self, src, dst):
+        """
+        Copy the times of a local folder to a destination folder, if the destination keeps them.
+        """
+        pass
+
+    def start_delivery(self):
+        """
+        Called before each delivery, resets what the backend remembers of the destination.
+        """
+        pass
+
+    def put_files(self, files):
+        """
+        Copy a list of local files to the destination, using the worker pool.
+
+        Args:
+            files (list[tuple(str, str)]): (source, destination) file paths.
+
+        Returns:
+            None
+        """
+        if self.workers == 1 or len(files) < 2:
+            for src, dst in files:
+                self.put_file(src, dst)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # list() raises the first upload error, if any
+            list(executor.map(lambda item: self.put_file(*item), files))
+
+    def close(self):
+        pass
+
+
+class LocalBackend(DestinationBackend):
+    """
+    Copy the deliveries to a folder of the local filesystem or a mounted share.
+    """
+
+    is_local = True
+    case_sensitive = os.name != "nt"
+
+    def __init__(self, export_folder, workers=1):
+        """
+        Args:
+            export_folder (str): Folder name, at the project root.
+            workers (int): Number of files copied at the same time.
+        """
+        DestinationBackend.__init__(self, workers)
+        self.export_folder = export_folder
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.EXPORT_FOLDER, workers=config.UPLOAD_WORKERS)
+
+    def normpath(self, path):
+        return os.path.normpath(path)
+
+    def join(self, *parts):
+        return os.path.join(*parts)
+
+    def basename(self, path):
+        return os.path.basename(os.path.normpath(path))
+
+    def get_root(self, project_path):
+        return f"{project_path}{self.export_folder}".replace('\\', '/')
+
+    def list_folders(self, path):
+        if not os.path.exists(path):
+            return []
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def put_file(self, src, dst):
+        shutil.copy2(src, dst)
+
+    def copy_folder_stat(self, src, dst):
+        shutil.copystat(src, dst)
+
+
+class SFTPBackend(DestinationBackend):
+    """
+    Upload the deliveries to an SFTP server, through a pool of connections.
+    """
+
+    def __init__(self, host, port=22, username=None, password=None, key_filename=None,
+                 known_hosts=None, root="/", workers=1, timeout=None):
+        if paramiko is None:
+            raise ImportError("The SFTP destination needs the paramiko package.")
+        DestinationBackend.__init__(self, workers)
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.key_filename = key_filename
+        self.known_hosts = known_hosts
+        self.root = root
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        self._clients = []
+        self._lock = threading.Lock()
+        self._created_dirs = set()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.SFTP_HOST,
+            port=config.SFTP_PORT,
+            username=config.SFTP_USERNAME,
+            password=config.SFTP_PASSWORD,
+            key_filename=config.SFTP_KEY_FILENAME,
+            known_hosts=config.SFTP_KNOWN_HOSTS,
+            root=config.SFTP_ROOT,
+            workers=config.UPLOAD_WORKERS,
+            timeout=config.CONNECT_TIMEOUT,
+        )
+
+    def _connect(self):
+        ssh = paramiko.SSHClient()
+        ssh.load_system_host_keys()
+        if self.known_hosts:
+            ssh.load_host_keys(self.known_hosts)
+        # unknown servers are refused, their key must be in the known hosts
+        ssh.set_missing_host_key_policy(paramiko.RejectPolicy())
+        ssh.connect(
+            self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            key_filename=self.key_filename,
+            timeout=self.timeout,
+            banner_timeout=self.timeout,
+            auth_timeout=self.timeout,
+        )
+        with self._lock:
+            self._clients.append(ssh)
+        return ssh, ssh.open_sftp()
+
+    def _acquire(self):
+        """
+        Take an idle and still connected SFTP session from the pool, or open a new one.
+        """
+        while True:
+            try:
+                session = self._pool.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            transport = session[0].get_transport()
+            if transport is not None and transport.is_active():
+                return session
+            self._discard(session)
+
+    def _release(self, session):
+        self._pool.put(session)
+
+    def _discard(self, session):
+        ssh, sftp = session
+        with self._lock:
+            if ssh in self._clients:
+                self._clients.remove(ssh)
+        try:
+            sftp.close()
+            ssh.close()
+        except Exception:
+            pass
+
+    @contextlib.contextmanager
+    def _session(self):
+        """
+        Borrow an SFTP session, the session is dropped instead of pooled if an error is raised.
+        """
+        session = self._acquire()
+        try:
+            yield session[1]
+        except BaseException:
+            self._discard(session)
+            raise
+        self._release(session)
+
+    def get_root(self, project_path):
+        return self.root
+
+    def list_folders(self, path):
+        with self._session() as sftp:
+            try:
+                attrs = sftp.listdir_attr(path)
+            except FileNotFoundError:
+                return []
+        return [a.filename for a in attrs if stat.S_ISDIR(a.st_mode)]
+
+    def makedirs(self, path):
+        path = self.normpath(path)
+        if path in self._created_dirs:
+            return
+
+        with self._session() as sftp:
+            current = '/' if path.startswith('/') else ""
+            for part in path.split('/'):
+                if not part:
+                    continue
+                current = posixpath.join(current, part)
+                if current in self._created_dirs:
+                    continue
+                try:
+                    sftp.stat(current)
+                except FileNotFoundError:
+                    sftp.mkdir(current)
+                self._created_dirs.add(current)
+
+    def start_delivery(self):
+        # folders may have been deleted on the server since the last delivery
+        self._created_dirs.clear()
+
+    def put_file(self, src, dst):
+        dst = self.normpath(dst)
+        with self._session() as sftp:
+            with open(src, 'rb') as fl, sftp.open(dst, 'wb') as remote:
+                remote.set_pipelined(True)
+                shutil.copyfileobj(fl, remote, 1024 * 1024)
+            st = os.stat(src)
+            sftp.utime(dst, (st.st_atime, st.st_mtime))
+
+    def close(self):
+        while not self._pool.empty():
+            self._discard(self._pool.get_nowait())
+        with self._lock:
+            for ssh in self._clients:
+                ssh.close()
+            self._clients = []
+        self._created_dirs.clear()
+
+
+class S3Backend(DestinationBackend):
+    """
+    Upload the deliveries to an S3 compatible bucket, with multipart uploads for big files.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, access_key=None, secret_key=None,
+                 region=None, workers=1, multipart_threshold=None, multipart_chunksize=None,
+                 timeout=None):
+        if boto3 is None:
+            raise ImportError("The S3 destination needs the boto3 package.")
+        DestinationBackend.__init__(self, workers)
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        # the client is thread safe, its connection pool is shared by the transfer threads
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            config=BotoConfig(
+                max_pool_connections=self.workers * 2,
+                # 60 is the botocore default
+                connect_timeout=timeout or 60,
+                ),
+        )
+        transfer_kwargs = {"max_concurrency": self.workers}
+        if multipart_threshold:
+            transfer_kwargs["multipart_threshold"] = multipart_threshold
+        if multipart_chunksize:
+            transfer_kwargs["multipart_chunksize"] = multipart_chunksize
+        self.transfer_config = TransferConfig(**transfer_kwargs)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.S3_BUCKET,
+            prefix=config.S3_PREFIX,
+            endpoint_url=config.S3_ENDPOINT_URL,
+            access_key=config.S3_ACCESS_KEY,
+            secret_key=config.S3_SECRET_KEY,
+            region=config.S3_REGION,
+            workers=config.UPLOAD_WORKERS,
+            multipart_threshold=config.MULTIPART_THRESHOLD,
+            multipart_chunksize=config.MULTIPART_CHUNK_SIZE,
+            timeout=config.CONNECT_TIMEOUT,
+        )
+
+    def _key(self, path):
+        return self.normpath(path).strip('/')
+
+    def get_root(self, project_path):
+        return self.prefix
+
+    def list_folders(self, path):
+        prefix = self._key(path)
+        prefix = f"{prefix}/" if prefix else ""
+        folders = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter="/"):
+            for common in page.get("CommonPrefixes", []):
+                folders.append(common["Prefix"][len(prefix):].rstrip('/'))
+        return folders
+
+    def makedirs(self, path):
+        # S3 has no folders, keys are created with the objects
+        pass
+
+    def put_file(self, src, dst):
+        self.client.upload_file(src, self.bucket, self._key(dst), Config=self.transfer_config)
+
+    def put_files(self, files):
+        # a single transfer manager schedules the files and their multipart chunks on one thread pool
+        with TransferManager(self.client, self.transfer_config) as manager:
+            futures = [manager.upload(src, self.bucket, self._key(dst)) for src, dst in files]
+            for future in futures:
+                future.result()
+
+
+BACKENDS = {
+    "local": LocalBackend,
+    "sftp": SFTPBackend,
+    "s3": S3Backend,
+}
+
+
+def get_backend(config):
+    """
+    Create the destination backend selected in the config.
+
+    Args:
+        config (env.Config): Plugin configuration.
+
+    Returns:
+        DestinationBackend: The backend instance.
+    """
+    name = config.DESTINATION_BACKEND.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown destination backend : {config.DESTINATION_BACKEND}")
+    return BACKENDS[name].from_config(config)
@@ -0,0 +1,120 @@
+import os
+import re
+import fnmatch
+
+
+class FileFilter(object):
+    """
+    Include/exclude rules compiled once and matched against os.scandir entries.
+    Patterns and extensions are case insensitive.
+    """
+
+    def __init__(self, include_patterns=None, exclude_patterns=None, exclude_folders=None,
+                 include_extensions=None, exclude_extensions=None, min_size=None, max_size=None):
+        """
+        Compile the filter rules.
+
+        Args:
+            include_patterns (list[str]): Globs a file name must match, empty to include every file.
+            exclude_patterns (list[str]): Globs excluding files and folders by name.
+            exclude_folders (list[str]): Globs excluding folders by name.
+            include_extensions (list[str]): Extensions a file must have, empty to include every extension.
+            exclude_extensions (list[str]): Extensions excluding files.
+            min_size (int): Minimum file size in bytes, or None.
+            max_size (int): Maximum file size in bytes, or None.
+        """
+        self.include_files = self.compile_patterns(include_patterns)
+        self.exclude_any = self.compile_patterns(exclude_patterns)
+        self.exclude_folders = self.compile_patterns(exclude_folders)
+        self.include_extensions = self.compile_extensions(include_extensions)
+        self.exclude_extensions = self.compile_extensions(exclude_extensions)
+        self.min_size = min_size
+        self.max_size = max_size
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a filter from the FILTERS section of a Config class.
+
+        Args:
+            config (env.Config): Plugin configuration.
+
+        Returns:
+            FileFilter: The compiled filter.
+        """
+        return cls(
+            include_patterns=config.INCLUDE_PATTERNS,
+            exclude_patterns=config.EXCLUDE_PATTERNS,
+            exclude_folders=config.EXCLUDE_FOLDERS,
+            include_extensions=config.INCLUDE_EXTENSIONS,
+            exclude_extensions=config.EXCLUDE_EXTENSIONS,
+            min_size=config.MIN_FILE_SIZE,
+            max_size=config.MAX_FILE_SIZE,
+        )
+
+    @staticmethod
+    def compile_patterns(patterns):
+        """
+        Merge a list of globs into a single regex.
+
+        Returns:
+            re.Pattern or None: The compiled regex, or None if there is no pattern.
+        """
+        if not patterns:
+            return None
+        return re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+
+    @staticmethod
+    def compile_extensions(extensions):
+        """
+        Normalize a list of extensions to a lowercase set without leading dots.
+
+        Returns:
+            frozenset[str] or None: The extensions, or None if there is no extension.
+        """
+        if not extensions:
+            return None
+        return frozenset(ext.lower().lstrip('.') for ext in extensions)
+
+    def accept(self, entry):
+        """
+        Check if a scandir entry passes the filter.
+        Uses the entry type cached by scandir, the file is only stat'ed when a size limit is set.
+        Entries that are neither a folder nor a file, like broken links, are rejected.
+
+        Args:
+            entry (os.DirEntry): Entry to check.
+
+        Returns:
+            bool: True if the entry must be copied.
+        """
+        name = entry.name
+        if self.exclude_any and self.exclude_any.match(name):
+            return False
+
+        if entry.is_dir():
+            return not (self.exclude_folders and self.exclude_folders.match(name))
+        if not entry.is_file():
+            return False
+
+        if self.include_files and not self.include_files.match(name):
+            return False
+
+        if self.include_extensions is not None or self.exclude_extensions is not None:
+            ext = os.path.splitext(name)[1].lower().lstrip('.')
+            if self.include_extensions is not None and ext not in self.include_extensions:
+                return False
+            if self.exclude_extensions is not None and ext in self.exclude_extensions:
+                return False
+
+        if self.min_size is not None or self.max_size is not None:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                return False
+            if self.min_size is not None and size < self.min_size:
+                return False
+            if self.max_size is not None and size > self.max_size:
+                return False
+
+        return True
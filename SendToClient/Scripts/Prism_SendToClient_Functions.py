@@ -50,13 +50,65 @@ except:
 from PrismUtils.Decorators import err_catcher_plugin as err_catcher
 
 import os
-import shutil
 import re
+import stat
+import functools
+import threading
+from concurrent.futures import Future
 from SetName import SetName
+from FileFilter import FileFilter
+from RenamePlan import RenamePlan
+from DestinationBackends import get_backend
 import subprocess
 
 from env import Config
 
+# characters replaced by "_" in the user names
+INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9]")
+
+
+class MenuResolver(QObject):
+    """
+    Enable a Send menu when the background part of its data is done, or hide it if there is no data.
+    """
+
+    resolved = Signal(object, object)
+
+    def __init__(self, send_menu, get_data):
+        """
+        Args:
+            send_menu (QtWidgets.QMenu): Menu to update.
+            get_data (callable): Called in the GUI thread with the future result and error,
+                                 returns the menu data or None.
+        """
+        # parented to the menu, lives in the GUI thread and is deleted with the menu
+        QObject.__init__(self, send_menu)
+        self.send_menu = send_menu
+        self.get_data = get_data
+        self.data = None
+        self.resolved.connect(self.on_resolved, Qt.QueuedConnection)
+
+    def watch(self, future):
+        """
+        Update the menu when the future is done, from any thread.
+        """
+        future.add_done_callback(self.emit_result)
+
+    def emit_result(self, future):
+        error = future.exception()
+        result = None if error else future.result()
+        try:
+            self.resolved.emit(result, error)
+        except RuntimeError:
+            # the menu was closed and deleted
+            pass
+
+    @Slot(object, object)
+    def on_resolved(self, result, error):
+        self.data = self.get_data(result, error)
+        self.send_menu.setEnabled(bool(self.data))
+        self.send_menu.menuAction().setVisible(bool(self.data))
+
 class Prism_SendToClient_Functions(object):
     """
 	Prism plugin that adds a Send to client menu to certain contextual menus.
@@ -73,6 +125,17 @@ class Prism_SendToClient_Functions(object):
         """
         self.core = core
         self.plugin = plugin
+        self.file_filter = FileFilter.from_config(Config)
+        self.rename_plan = RenamePlan.from_config(Config)
+        # created on first send, keeps its connections open between deliveries
+        self.destination = None
+        # scene files are stat'ed in daemon threads while the context menu opens,
+        # a stalled share does not block other paths nor Prism exit
+        self.pending_scenefile_stats = {}
+        self.pending_lock = threading.Lock()
+        self.cached_scenefile_data = functools.lru_cache(
+            maxsize=Config.RESOLVE_CACHE_SIZE
+            )(self.read_scenefile_data)
 
         # Only for Prism Standalone
         if self.core.appPlugin.pluginName == "Standalone":
@@ -90,6 +153,15 @@ class Prism_SendToClient_Functions(object):
                 "mediaPlayerContextMenuRequested", self.mediaPlayerContextMenuRequested, plugin=self.plugin
             )
 
+    @err_catcher(name=__name__)
+    def unregister(self):
+        """
+        Called by Prism when the plugin is unloaded, closes the destination connections.
+        """
+        if self.destination is not None:
+            self.destination.close()
+            self.destination = None
+
     # if returns true, the plugin will be loaded by Prism
     @err_catcher(name=__name__)
     def isActive(self):
@@ -100,8 +172,9 @@ class Prism_SendToClient_Functions(object):
     def openPBFileContextMenu(self, origin, menu, path):
         """
         Handle context menu request on a scene file.
-        Extracts Prism data from the given file path. If data is found,
-        adds a "send to client" action to the context menu.
+        Adds a disabled "send to client" action to the context menu right away.
+        The file is stat'ed in the background, then its Prism data is extracted in the GUI thread
+        and the action is enabled, or hidden if the path is not a scene file.
 
         Args:
             origin (ProjectScripts.SceneBrowser.SceneBrowser): Instance triggering the context menu (scene browser).
@@ -113,17 +186,21 @@ class Prism_SendToClient_Functions(object):
         """
 
         # if click on a scenefile
-        if os.path.isfile(path):
+        if path:
+            # create buttons, disabled until the file data is resolved
+            send_menu = self.create_buttons(menu, lambda: resolver.data)
+            send_menu.setEnabled(False)
             # get file data
-            data = self.core.getScenefileData(path, getEntityFromPath=True)
-            # create buttons
-            self.create_buttons(menu, data)
+            resolver = MenuResolver(
+                send_menu, lambda mtime, error: self.get_resolved_scenefile_data(path, mtime, error)
+                )
+            resolver.watch(self.stat_scenefile_async(path))
 
     def mediaPlayerContextMenuRequested(self, mediaplayer, menu):
         """
         Handle context menu request on the media player.
-        Extracts Prism data from the currently loaded media,
-        adds a "send to client" action to the context menu.
+        Adds a "send to client" action to the context menu,
+        the Prism data of the currently loaded media is extracted when an action is triggered.
 
         Args:
             mediaplayer (ProjectScripts.MediaBrowser.MediaPlayer): Prism scene browser.
@@ -133,14 +210,13 @@ class Prism_SendToClient_Functions(object):
             None
         """
 
-        data = mediaplayer.origin.getCurrentVersion()
-        self.create_buttons(menu, data)
+        self.create_buttons(menu, mediaplayer.origin.getCurrentVersion)
 
     def openPBListContextMenu(self, mediabrowser, menu, lw, item, path):
         """
         Handle context menu request on a media.
-        Extracts Prism data from the given media version.
         If click conditions are True, adds a "send to client" action to the context menu. 
+        The Prism data of the media version is extracted when an action is triggered.
 
         Args:
             mediabrowser (ProjectScripts.MediaBrowser.MediaBrowser): Instance triggering the context menu (media browser).
@@ -155,16 +231,14 @@ class Prism_SendToClient_Functions(object):
         """
 
         # If click in the version column
-        if lw == mediabrowser.lw_version:
-            data = mediabrowser.getCurrentVersion()
-            if data:
-                self.create_buttons(menu, data)
+        if lw == mediabrowser.lw_version and item:
+            self.create_buttons(menu, mediabrowser.getCurrentVersion)
 
     def productSelectorContextMenuRequested(self, productbrowser, lw, pos, menu):
         """
         Handle context menu request on a product.
-        Extracts Prism data from the given product version.
         If click conditions are True, adds a "send to client" action to the context menu. 
+        The Prism data of the product version is extracted when an action is triggered.
 
         Args:
             productbrowser (ProjectScripts.ProductBrowser.ProductBrowser): Instance triggering the context menu (media browser).
@@ -178,37 +252,151 @@ class Prism_SendToClient_Functions(object):
         """
 
         # If click in the version column
-        if lw == productbrowser.tw_versions:
-            data = productbrowser.getCurrentVersion()
-            if data:
-                self.create_buttons(menu, data)
+        if lw == productbrowser.tw_versions and lw.itemAt(pos):
+            self.create_buttons(menu, productbrowser.getCurrentVersion)
     # END CALLBACKS
                 
     
-    def create_buttons(self, menu, data):
+    def create_buttons(self, menu, get_data):
         """
         Create a menu "Send to client" and two actions in the contextual menu.
 
         Args:
             menu (QtWidgets.QMenu): Context menu being constructed.
-            data (dict): file/folder entity informations.
+            get_data (callable): Returns the file/folder entity informations, called when an action is triggered.
 
 
         Returns:
-            None
+            QtWidgets.QMenu: The "Send to client" menu.
         """
 
-        send_menu = QMenu(Config.MENU_NAME)
+        send_menu = QMenu(Config.MENU_NAME, menu)
 
         send_act = QAction(Config.ACTION_NAME, menu)
-        send_act.triggered.connect(lambda : self.copyAction(data))
+        send_act.triggered.connect(lambda : self.send(self.copyAction, get_data))
         send_menu.addAction(send_act)
 
         quick_send_act = QAction(Config.QUICK_ACTION_NAME, menu)
-        quick_send_act.triggered.connect(lambda : self.quick_copyAction(data))
+        quick_send_act.triggered.connect(lambda : self.send(self.quick_copyAction, get_data))
         send_menu.addAction(quick_send_act)
 
         menu.addMenu(send_menu)
+        return send_menu
+
+    @err_catcher(name=__name__)
+    def send(self, action, get_data):
+        """
+        Resolve the entity informations and run a send action.
+
+        Args:
+            action (callable): copyAction or quick_copyAction.
+            get_data (callable): Returns the file/folder entity informations.
+
+        Returns:
+            None
+        """
+        data = get_data()
+        if not data:
+            self.core.popup("Can't retrieve export data",
+                            severity="error")
+            return
+
+        action(data)
+
+    def stat_scenefile_async(self, path):
+        """
+        Start checking a scene file in a daemon thread, the disk access is the slow part on a share.
+        A path already being checked is not checked twice.
+
+        Args:
+            path (str): Path to a scene file.
+
+        Returns:
+            concurrent.futures.Future: Future of the scene file modification time, None if it is not a file.
+        """
+        with self.pending_lock:
+            future = self.pending_scenefile_stats.get(path)
+            if future is None:
+                future = Future()
+                self.pending_scenefile_stats[path] = future
+                threading.Thread(
+                    target=self.stat_worker, args=(path, future), daemon=True
+                    ).start()
+        return future
+
+    def stat_worker(self, path, future):
+        # only touches the disk, Prism is not called from this thread
+        try:
+            future.set_result(self.stat_scenefile(path))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self.pending_lock:
+                self.pending_scenefile_stats.pop(path, None)
+
+    def stat_scenefile(self, path):
+        """
+        Return the modification time of a scene file.
+
+        Args:
+            path (str): Path to a scene file.
+
+        Returns:
+            int or None: Modification time in nanoseconds, or None if path is not a file.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return st.st_mtime_ns
+
+    def get_resolved_scenefile_data(self, path, mtime, error):
+        """
+        Retrieve the Prism data of a scene file once it has been stat'ed, in the GUI thread.
+        Errors are written to the Prism error log.
+
+        Args:
+            path (str): Path to a scene file.
+            mtime (int): Modification time returned by stat_scenefile.
+            error (Exception): Error raised while checking the file, or None.
+
+        Returns:
+            dict or None: scene file data, or None if path is not a scene file.
+        """
+        if error is None and mtime is not None:
+            try:
+                return self.get_scenefile_data(path, mtime)
+            except Exception as e:
+                error = e
+
+        if error is not None:
+            self.core.writeErrorLog(
+                f"SendToClient - Can't read the scene file data of {path} : {error!r}"
+                )
+        return None
+
+    def get_scenefile_data(self, path, mtime):
+        """
+        Retrieve the Prism data of a scene file, cached by path and modification time.
+
+        Args:
+            path (str): Path to a scene file.
+            mtime (int): Modification time of the file.
+
+        Returns:
+            dict or None: scene file data.
+        """
+        data = self.cached_scenefile_data(path, mtime)
+        # the cached dict is shared, return a copy
+        return dict(data) if data else data
+
+    def read_scenefile_data(self, path, mtime):
+        """
+        Read the Prism data of a scene file, mtime is only used as a cache key.
+        """
+        return self.core.getScenefileData(path, getEntityFromPath=True)
 
     @err_catcher(name=__name__)
     def open_explorer(self, path):
@@ -225,6 +413,17 @@ class Prism_SendToClient_Functions(object):
         cmd = 'explorer ' + path
         subprocess.Popen(cmd)
 
+    def get_destination(self):
+        """
+        Retrieve the destination backend selected in the config, created on first call.
+
+        Returns:
+            DestinationBackends.DestinationBackend : destination backend
+        """
+        if self.destination is None:
+            self.destination = get_backend(Config)
+        return self.destination
+
     @err_catcher(name=__name__)
     def get_export_folder(self, data):
         """
@@ -238,89 +437,106 @@ class Prism_SendToClient_Functions(object):
         """
         project_path = self.core.projectPath
 
-        return f"{project_path}{Config.EXPORT_FOLDER}".replace('\\', '/')
+        return self.get_destination().get_root(project_path)
 
     @err_catcher(name=__name__)
-    def copy_files(self, src, dst):
+    def copy_files(self, src, dst, name=None):
         """
-        Copy a file or directory from a source path to a destination path.
+        Copy a file or directory from a source path to the destination backend.
+        Existing folders are merged and existing files replaced.
+        If a file name template is set, every file of a directory is renamed while it is copied.
 
         Args:
         src (str): Path to the source file or directory.
         dst (str): Path to the destination directory.
+        name (str): New name of the copied file (without extension) or directory,
+                    or None to keep the source name.
 
         Returns:
             str or None: Path to the copied file (if source is a file),
                         or destination directory path (if directory copied),
                         or None if nothing is done.
         """
+        destination = self.get_destination()
 
-        src = src.replace('/', '\\')
-        dst = dst.replace('/', '\\')
+        src = os.path.normpath(src)
+        dst = destination.normpath(dst)
 
         if not os.path.exists(src):
             raise FileNotFoundError(f"Source file doesn't exists : {src}")
         
         # dst folder creation
-        if not os.path.exists(dst):
-            os.makedirs(dst)
+        destination.start_delivery()
+        destination.makedirs(dst)
 
         # src is a file
         if os.path.isfile(src):
-            return shutil.copy2(src, dst)
+            file_name = os.path.basename(src)
+            if name:
+                file_name = name + os.path.splitext(src)[1]
+            target_path = destination.join(dst, file_name)
+            destination.put_file(src, target_path)
+            return target_path
 
         # src is a folder
         elif os.path.isdir(src):
-            base_name = os.path.basename(os.path.normpath(src))
-            target_path = os.path.join(dst, base_name)
-            if os.path.abspath(src) == os.path.abspath(target_path):
+            base_name = name or os.path.basename(os.path.normpath(src))
+            target_path = destination.join(dst, base_name)
+            if destination.is_local and os.path.abspath(src) == os.path.abspath(target_path):
                 raise ValueError("Source and destination must be different. ")
 
-            def ignore_patterns_custom(dir_path, names):
-                ignored = []
-                for name in names:
-                    full_path = os.path.join(dir_path, name)
-                    if name == "versioninfo.json":
-                        ignored.append(name)
-                    elif name == "_thumbs" and os.path.isdir(full_path):
-                        ignored.append(name)
-                return ignored
-
-            return shutil.copytree(src, target_path, dirs_exist_ok=True, ignore=ignore_patterns_custom)
+            folders = []
+            files = []
+            self.collect_files(src, target_path, folders, files)
+            folders.append((src, target_path))
+            if self.rename_plan and name:
+                files = self.rename_plan.resolve(files, name, destination.case_sensitive)
+
+            for folder_src, folder in folders:
+                destination.makedirs(folder)
+            destination.put_files(
+                [(file_src, destination.join(folder, file_name)) for file_src, folder, file_name in files]
+                )
+            # after the files, copying them changes the folder times
+            for folder_src, folder in folders:
+                destination.copy_folder_stat(folder_src, folder)
+            return target_path
         else:
             raise ValueError(f"Src must me a folder or a file : {src}")
 
-    @err_catcher(name=__name__)  
-    def rename_files(self, src, name):
+    def collect_files(self, src, dst, folders, files):
         """
-        Rename a file or directory to the given name, preserving its extension (if file) or path (if folder).
+        Recursively list the folders and files of a directory accepted by the file filter.
+        Walks the tree with os.scandir so the filter uses the cached entry types.
+        Folders without any accepted file are left out, subfolders are listed before their parent.
 
         Args:
-            src (str): Path to the file or directory to rename.
-            name (str): New name to apply (without extension if a file).
+            src (str): Path to the source directory.
+            dst (str): Destination path matching src.
+            folders (list[tuple(str, str)]): (source, destination) subfolders, filled in place.
+            files (list[tuple(str, str, str)]): (source path, destination folder, file name), filled in place.
 
         Returns:
-            None
+            bool: True if at least one file is kept under src.
         """
+        destination = self.get_destination()
+        kept = False
 
-        # source is a file
-        if os.path.isfile(src):
-            ext = os.path.splitext(src)[1]
-            new_name = f"{os.path.dirname(src)}/{name}{ext}"
-            
-            os.replace(src, new_name)
+        with os.scandir(src) as entries:
+            for entry in entries:
+                if not self.file_filter.accept(entry):
+                    continue
 
-        # source is a directory
-        elif os.path.isdir(src):
-            folders = src.split('\\')[:-1]
-            folders.append(name)
-            target = '\\'.join(folders)
+                if entry.is_dir():
+                    dst_path = destination.join(dst, entry.name)
+                    if self.collect_files(entry.path, dst_path, folders, files):
+                        folders.append((entry.path, dst_path))
+                        kept = True
+                else:
+                    files.append((entry.path, dst, entry.name))
+                    kept = True
 
-            # merge folder is the target already exists
-            if os.path.exists(target):
-                self.merge_folders(src, target)
-            else:
-                os.replace(src, target)
+        return kept
 
     @err_catcher(name=__name__)
     def get_existing_folders(self, search_dir):
@@ -331,17 +547,17 @@ class Prism_SendToClient_Functions(object):
             search_dir (str): Path to the directory to search for subfolders.
 
         Returns:
-            list[str]: List of subdirectory names found in `search_dir`, reversed in order.
-        """
-            
-        if os.path.exists(search_dir):
-            existing_folders = []
-            for dir in os.listdir(search_dir):
-                if os.path.isdir(os.path.join(search_dir, dir)):
-                    existing_folders.append(dir)
-            return existing_folders[::-1]
-        else:
+            list[str]: List of subdirectory names found in `search_dir`, reversed in order,
+                       or an empty list if the destination can't be reached.
+        """
+
+        try:
+            existing_folders = self.get_destination().list_folders(search_dir)
+        except Exception as e:
+            self.core.popup(f"Can't list the existing folders of {search_dir} :\n{e}",
+                            severity="warning")
             return []
+        return existing_folders[::-1]
     
     @err_catcher(name=__name__)
     def quick_copyAction(self, data):
@@ -371,19 +587,12 @@ class Prism_SendToClient_Functions(object):
         export_folder = self.get_export_folder(data)
         placeholder_dest_folder = Config.get_default_destination_folder_name()
 
-        destination_media_folder = placeholder_export_name
-        destination_media_folder = re.sub(
-            r"[^a-zA-Z0-9]", "_", destination_media_folder
-            )
-        destination_media_path = os.path.join(
+        destination_media_path = self.get_destination().join(
             export_folder, placeholder_dest_folder
             )
-        destination_media_name = placeholder_dest_folder
-        destination_media_name = re.sub(r"[^a-zA-Z0-9]", "_", destination_media_name)
+        destination_media_name = INVALID_NAME_CHARS.sub("_", placeholder_export_name)
 
-        copied = self.copy_files(media_folder, destination_media_path)
-
-        self.rename_files(copied, placeholder_export_name)
+        self.copy_files(media_folder, destination_media_path, destination_media_name)
 
         self.core.popup(f"{destination_media_name} exported!")
 
@@ -424,51 +633,27 @@ class Prism_SendToClient_Functions(object):
         if placeholder_dest_folder not in existing_folders:
             existing_folders.insert(0, placeholder_dest_folder)
         dlg.c_mediaFolders.addItems(existing_folders)
-        dlg.b_explorer.clicked.connect(
-            lambda: self.open_explorer(export_folder)
-            )
+        if self.get_destination().is_local:
+            dlg.b_explorer.clicked.connect(
+                lambda: self.open_explorer(export_folder)
+                )
+        else:
+            dlg.b_explorer.setVisible(False)
         result = dlg.exec_()
         if result == 0:
             return
 
         # RETRIEVE AND FORMAT USER INPUT
         destination_media_folder = dlg.c_mediaFolders.currentText()
-        destination_media_folder = re.sub(
-            r"[^a-zA-Z0-9]", "_", destination_media_folder
+        destination_media_folder = INVALID_NAME_CHARS.sub(
+            "_", destination_media_folder
             )
-        destination_media_path = os.path.join(
+        destination_media_path = self.get_destination().join(
             export_folder, destination_media_folder
             )
         destination_media_name = dlg.e_mediaName.text()
-        destination_media_name = re.sub(r"[^a-zA-Z0-9]", "_", destination_media_name)
+        destination_media_name = INVALID_NAME_CHARS.sub("_", destination_media_name)
 
-        copied = self.copy_files(export_path, destination_media_path)
-
-        self.rename_files(copied, destination_media_name)
+        self.copy_files(export_path, destination_media_path, destination_media_name)
 
         self.core.popup(f"{destination_media_name} exported!")
-
-    def merge_folders(self, src, dst):
-        """
-        Recursively merge contents of the source directory into the destination directory.
-
-        Args:
-            src (str): Path to the source directory.
-            dst (str): Path to the destination directory.
-
-        Returns:
-            None
-        """
-        if not os.path.isdir(src):
-            raise ValueError(f"{src} is not a correct directory.")
-        if not os.path.isdir(dst):
-            os.makedirs(dst)
-
-        for item in os.listdir(src):
-            src_path = os.path.join(src, item)
-            dst_path = os.path.join(dst, item)
-
-            if os.path.isdir(src_path):
-                self.merge_folders(src_path, dst_path) 
-            else:
-                shutil.copy2(src_path, dst_path)  # replace or copy file
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import re
+import string
+
+# frame number at the end of a file stem, after a "." or "_" separator, e.g. "0001" in "render.0001"
+FRAME_PATTERN = re.compile(r"^(.*?)[._](\d+)$")
+
+# fields available in the templates
+TEMPLATE_FIELDS = ("name", "frame", "stem", "ext")
+
+
+class RenamePlan(object):
+    """
+    Template-driven names for every file of a delivered folder, collisions resolved before anything is sent.
+    """
+
+    def __init__(self, template, template_no_frame="{name}{ext}", frame_padding=None):
+        """
+        Args:
+            template (str): Name of the files with a frame number, e.g. "{name}.{frame}{ext}".
+            template_no_frame (str): Name of the files without a frame number.
+            frame_padding (int): Frame number padding, or None to keep the source padding.
+        """
+        self.template = self.check_template(template)
+        self.template_no_frame = self.check_template(template_no_frame)
+        self.frame_padding = frame_padding
+
+    @staticmethod
+    def check_template(template):
+        """
+        Check that a template only uses the known fields, so a typo is reported when the plugin loads.
+
+        Args:
+            template (str): File name template.
+
+        Returns:
+            str: The template.
+
+        Raises:
+            ValueError: If the template is not valid.
+        """
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+            unknown = [field for field in fields if field not in TEMPLATE_FIELDS]
+            if unknown:
+                raise ValueError(f"unknown field {unknown[0]!r}, use {', '.join(TEMPLATE_FIELDS)}")
+            template.format(**{field: "" for field in TEMPLATE_FIELDS})
+        except ValueError as e:
+            raise ValueError(f"Invalid file name template {template!r} : {e}")
+        return template
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a rename plan from the RENAME section of a Config class.
+
+        Args:
+            config (env.Config): Plugin configuration.
+
+        Returns:
+            RenamePlan or None: The rename plan, or None if no template is set.
+        """
+        if not config.FILE_NAME_TEMPLATE:
+            return None
+        return cls(
+            config.FILE_NAME_TEMPLATE,
+            template_no_frame=config.FILE_NAME_TEMPLATE_NO_FRAME,
+            frame_padding=config.FRAME_PADDING,
+        )
+
+    @staticmethod
+    def split_frame(file_name):
+        """
+        Split a file name into its sequence stem, frame number and extension.
+
+        Args:
+            file_name (str): Source file name.
+
+        Returns:
+            tuple(str, str, str): (stem without the frame, frame or None, extension).
+        """
+        stem, ext = os.path.splitext(file_name)
+        match = FRAME_PATTERN.match(stem)
+        if not match:
+            return stem, None, ext
+        return match.group(1), match.group(2), ext
+
+    def target_name(self, file_name, name, sequence=True):
+        """
+        Apply the template to a file name.
+
+        Args:
+            file_name (str): Source file name.
+            name (str): Delivery name.
+            sequence (bool): False if the file is alone, its trailing digits are then not a frame.
+
+        Returns:
+            str: The new file name.
+        """
+        stem, frame, ext = self.split_frame(file_name)
+        if frame is None or not sequence:
+            stem = os.path.splitext(file_name)[0]
+            return self.template_no_frame.format(name=name, stem=stem, ext=ext, frame="")
+
+        if self.frame_padding:
+            frame = frame.zfill(self.frame_padding)
+        return self.template.format(name=name, stem=stem, ext=ext, frame=frame)
+
+    def resolve(self, files, name, case_sensitive=True):
+        """
+        Compute the new name of every file.
+        Files of the same sequence are named together: when a sequence collides with another one
+        in its folder, a _<n> suffix is added to the delivery name of the whole sequence.
+        A sequence has at least 2 files, a lone file is named with the template without frame.
+
+        Args:
+            files (list[tuple(str, str, str)]): (source path, destination folder, file name).
+            name (str): Delivery name.
+            case_sensitive (bool): False if the destination does not tell names apart by case.
+
+        Returns:
+            list[tuple(str, str, str)]: (source path, destination folder, new file name).
+        """
+        # group the files by sequence, a file without frame number is a group on its own
+        groups = {}
+        for src, folder, file_name in files:
+            stem, frame, ext = self.split_frame(file_name)
+            key = (folder, stem, ext) if frame is not None else (folder, file_name, None)
+            groups.setdefault(key, []).append((src, file_name))
+
+        sequences = {}
+        for key, group in groups.items():
+            if key[2] is not None and len(group) == 1:
+                key = (key[0], group[0][1], None)
+            sequences[key] = group
+
+        used = set()
+        planned = []
+        # sorted so the suffixes do not depend on the scandir order
+        for key in sorted(sequences, key=lambda k: (k[0], k[1], k[2] or "")):
+            folder = key[0]
+            is_sequence = key[2] is not None
+            index = 0
+            sequence_name = name
+            targets = None
+            while True:
+                previous = targets
+                targets = [
+                    self.target_name(file_name, sequence_name, is_sequence)
+                    for src, file_name in sequences[key]
+                    ]
+                keys = {(folder, t if case_sensitive else t.lower()) for t in targets}
+                if len(keys) != len(targets):
+                    raise ValueError(f"The file name template gives the same name to several files : {targets[0]}")
+                if not keys & used:
+                    break
+                # the suffix does not change the names, e.g. the template has no {name}
+                if targets == previous:
+                    raise ValueError(f"Can't find a free name for : {targets[0]}")
+                index += 1
+                sequence_name = f"{name}_{index}"
+
+            used |= keys
+            planned.extend(
+                (src, folder, target) for (src, file_name), target in zip(sequences[key], targets)
+                )
+        return planned
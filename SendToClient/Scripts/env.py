@@ -6,10 +6,66 @@ class Config(object):
     MENU_NAME = "Send to client"
     ACTION_NAME = "Send to client"
     QUICK_ACTION_NAME = "Quick Send to client"
+    # Number of scene files whose data is kept in memory for the context menu.
+    RESOLVE_CACHE_SIZE = 256
 
     # PATHS
     EXPORT_FOLDER = "08_ToClient"
 
+    # FILTERS
+    # Patterns and extensions are case insensitive.
+    # Glob patterns matched against file names only, folders are always included.
+    # An empty INCLUDE_PATTERNS list means every file is included.
+    INCLUDE_PATTERNS = []
+    # Glob patterns matched against file and folder names.
+    EXCLUDE_PATTERNS = ["versioninfo.json"]
+    # Glob patterns matched against folder names only.
+    EXCLUDE_FOLDERS = ["_thumbs"]
+    # Extensions without the leading dot, case insensitive.
+    # An empty INCLUDE_EXTENSIONS list means every extension is included.
+    INCLUDE_EXTENSIONS = []
+    EXCLUDE_EXTENSIONS = []
+    # File size limits in bytes, None to disable.
+    MIN_FILE_SIZE = None
+    MAX_FILE_SIZE = None
+
+    # DESTINATION
+    # "local" copies to EXPORT_FOLDER, "sftp" and "s3" upload to the client server.
+    DESTINATION_BACKEND = "local"
+    # Number of files sent at the same time.
+    UPLOAD_WORKERS = 8
+    # Seconds to wait for the SFTP or S3 server to answer before giving up.
+    CONNECT_TIMEOUT = 10
+    # SFTP server, needs paramiko.
+    SFTP_HOST = "localhost"
+    SFTP_PORT = 22
+    SFTP_USERNAME = None
+    SFTP_PASSWORD = None
+    SFTP_KEY_FILENAME = None
+    # Extra known_hosts file, the server key must be in it or in the system known hosts.
+    SFTP_KNOWN_HOSTS = None
+    SFTP_ROOT = "/upload"
+    # S3 compatible bucket, needs boto3.
+    # Set S3_ENDPOINT_URL for a non AWS server, e.g. "http://localhost:9000" for MinIO.
+    S3_ENDPOINT_URL = None
+    S3_BUCKET = ""
+    S3_PREFIX = ""
+    S3_ACCESS_KEY = None
+    S3_SECRET_KEY = None
+    S3_REGION = None
+    # Files bigger than the threshold are uploaded in concurrent chunks, sizes in bytes.
+    MULTIPART_THRESHOLD = 64 * 1024 * 1024
+    MULTIPART_CHUNK_SIZE = 16 * 1024 * 1024
+
+    # RENAME
+    # Name given to every file of a delivered folder, None to keep the file names.
+    # Fields: {name} delivery name, {frame} frame number, {stem} and {ext} source file name parts.
+    FILE_NAME_TEMPLATE = None  # e.g. "{name}.{frame}{ext}"
+    # Name of the files without a frame number, a _<n> suffix is added on collisions.
+    FILE_NAME_TEMPLATE_NO_FRAME = "{name}{ext}"
+    # Frame number padding, None to keep the source padding.
+    FRAME_PADDING = None
+
 
     def get_placeholder_export_name(data):
         """
@@ -0,0 +1,64 @@
+import os
+import sys
+import types
+
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SendToClient", "Scripts")
+sys.path.insert(0, SCRIPTS)
+
+# PrismUtils is provided by Prism at runtime, err_catcher only reports the plugin errors
+try:
+    import PrismUtils.Decorators
+except ImportError:
+    decorators = types.ModuleType("PrismUtils.Decorators")
+    decorators.err_catcher_plugin = lambda name: (lambda func: func)
+    prism_utils = types.ModuleType("PrismUtils")
+    prism_utils.Decorators = decorators
+    sys.modules["PrismUtils"] = prism_utils
+    sys.modules["PrismUtils.Decorators"] = decorators
+
+
+class FakeCore(object):
+    def __init__(self, project_path):
+        self.projectPath = project_path
+        self.appPlugin = types.SimpleNamespace(pluginName="Tests")
+        self.errors = []
+
+    def popup(self, *args, **kwargs):
+        pass
+
+    def writeErrorLog(self, text, fatal=False):
+        self.errors.append(text)
+
+
+@pytest.fixture
+def make_plugin(tmp_path):
+    """
+    Return a function creating the plugin functions for a project in tmp_path,
+    Config must be patched before the call.
+    """
+    if not any(_importable(qt) for qt in ("PySide6", "PySide2")):
+        pytest.skip("PySide2 or PySide6 is needed")
+    from Prism_SendToClient_Functions import Prism_SendToClient_Functions
+
+    plugins = []
+
+    def make():
+        project = tmp_path / "project"
+        project.mkdir(exist_ok=True)
+        plugin = Prism_SendToClient_Functions(FakeCore(f"{project}{os.sep}"), None)
+        plugins.append(plugin)
+        return plugin
+
+    yield make
+    for plugin in plugins:
+        plugin.unregister()
+
+
+def _importable(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
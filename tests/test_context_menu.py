@@ -0,0 +1,167 @@
+import os
+import threading
+import types
+
+import pytest
+
+
+@pytest.fixture
+def plugin(make_plugin):
+    plugin = make_plugin()
+    plugin.reads = []
+
+    def getScenefileData(path, getEntityFromPath=False):
+        plugin.reads.append((path, threading.current_thread()))
+        return {"filename": path}
+
+    plugin.core.getScenefileData = getScenefileData
+    return plugin
+
+
+@pytest.fixture
+def scenefile(tmp_path):
+    path = tmp_path / "sh010_v001.hip"
+    path.write_text("")
+    return str(path)
+
+
+def test_scenefile_data_is_cached(plugin, scenefile):
+    mtime = plugin.stat_scenefile(scenefile)
+
+    assert plugin.get_scenefile_data(scenefile, mtime) == {"filename": scenefile}
+    assert plugin.get_scenefile_data(scenefile, mtime) == {"filename": scenefile}
+    assert len(plugin.reads) == 1
+
+
+def test_changed_mtime_reads_again(plugin, scenefile):
+    plugin.get_scenefile_data(scenefile, plugin.stat_scenefile(scenefile))
+    os.utime(scenefile, ns=(1, 1000000000))
+    plugin.get_scenefile_data(scenefile, plugin.stat_scenefile(scenefile))
+
+    assert len(plugin.reads) == 2
+
+
+def test_cached_data_is_a_copy(plugin, scenefile):
+    mtime = plugin.stat_scenefile(scenefile)
+    plugin.get_scenefile_data(scenefile, mtime)["filename"] = "changed"
+
+    assert plugin.get_scenefile_data(scenefile, mtime) == {"filename": scenefile}
+
+
+def test_folder_or_missing_path_is_not_a_scenefile(plugin, tmp_path):
+    assert plugin.stat_scenefile(str(tmp_path)) is None
+    assert plugin.stat_scenefile(str(tmp_path / "missing.hip")) is None
+    assert plugin.get_resolved_scenefile_data(str(tmp_path), None, None) is None
+    assert plugin.reads == []
+    assert plugin.core.errors == []
+
+
+def test_path_being_checked_is_checked_once(plugin, scenefile):
+    release = threading.Event()
+    stats = []
+
+    def slow_stat(path):
+        stats.append(path)
+        release.wait(5)
+        return 1
+
+    plugin.stat_scenefile = slow_stat
+    first = plugin.stat_scenefile_async(scenefile)
+    second = plugin.stat_scenefile_async(scenefile)
+    release.set()
+
+    assert first is second
+    assert first.result(5) == 1
+    assert stats == [scenefile]
+    # once done, a new click checks the file again
+    assert plugin.stat_scenefile_async(scenefile).result(5) == 1
+    assert len(stats) == 2
+
+
+def test_errors_are_logged(plugin, scenefile):
+    assert plugin.get_resolved_scenefile_data(scenefile, None, PermissionError("denied")) is None
+    assert "denied" in plugin.core.errors[-1]
+
+    def broken(path, getEntityFromPath=False):
+        raise KeyError("entity")
+
+    plugin.core.getScenefileData = broken
+    assert plugin.get_resolved_scenefile_data(scenefile, 1, None) is None
+    assert "entity" in plugin.core.errors[-1]
+
+
+def test_media_menu_needs_a_clicked_item(plugin):
+    created = []
+    plugin.create_buttons = lambda menu, get_data: created.append(get_data)
+    lw = object()
+    mediabrowser = types.SimpleNamespace(lw_version=lw, getCurrentVersion=lambda: {"path": "v001"})
+
+    plugin.openPBListContextMenu(mediabrowser, None, lw, None, None)
+    assert created == []
+
+    plugin.openPBListContextMenu(mediabrowser, None, object(), object(), None)
+    assert created == []
+
+    plugin.openPBListContextMenu(mediabrowser, None, lw, object(), None)
+    assert len(created) == 1
+    assert created[0]() == {"path": "v001"}
+
+
+def test_product_menu_needs_an_item_under_the_cursor(plugin):
+    created = []
+    plugin.create_buttons = lambda menu, get_data: created.append(get_data)
+    items = {}
+    lw = types.SimpleNamespace(itemAt=lambda pos: items.get(pos))
+    productbrowser = types.SimpleNamespace(tw_versions=lw, getCurrentVersion=lambda: {"path": "v001"})
+
+    plugin.productSelectorContextMenuRequested(productbrowser, lw, "empty", None)
+    assert created == []
+
+    items["row"] = object()
+    plugin.productSelectorContextMenuRequested(productbrowser, lw, "row", None)
+    assert len(created) == 1
+
+
+@pytest.fixture
+def qapp(monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        from PySide2.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def wait_for(qapp, condition):
+    for _ in range(500):
+        qapp.processEvents()
+        if condition():
+            return True
+        threading.Event().wait(0.01)
+    return False
+
+
+def test_scenefile_menu_is_enabled_in_the_gui_thread(plugin, scenefile, qapp):
+    from Prism_SendToClient_Functions import QMenu
+
+    menu = QMenu()
+    plugin.openPBFileContextMenu(None, menu, scenefile)
+    send_action = menu.actions()[0]
+    assert not send_action.isEnabled()
+
+    assert wait_for(qapp, send_action.isEnabled)
+    assert send_action.isVisible()
+    # Prism is only called from the GUI thread
+    assert plugin.reads == [(scenefile, threading.main_thread())]
+
+
+def test_folder_menu_is_hidden(plugin, tmp_path, qapp):
+    from Prism_SendToClient_Functions import QMenu
+
+    menu = QMenu()
+    plugin.openPBFileContextMenu(None, menu, str(tmp_path))
+    send_action = menu.actions()[0]
+
+    assert wait_for(qapp, lambda: not send_action.isVisible())
+    assert not send_action.isEnabled()
+    assert plugin.reads == []
@@ -0,0 +1,289 @@
+import os
+import types
+import uuid
+import threading
+
+import pytest
+
+import DestinationBackends
+from DestinationBackends import DestinationBackend, SFTPBackend
+from env import Config
+
+
+@pytest.fixture
+def sequence(tmp_path):
+    """
+    A rendered folder with two sequences, a single file and the Prism files that must not be sent.
+    """
+    src = tmp_path / "src" / "v001"
+    (src / "_thumbs").mkdir(parents=True)
+    (src / "_thumbs" / "beauty.jpg").write_bytes(b"thumb")
+    (src / "versioninfo.json").write_text("{}")
+    for frame in ("0001", "0002"):
+        (src / f"beauty.{frame}.exr").write_bytes(b"beauty" + frame.encode())
+        (src / f"depth.{frame}.exr").write_bytes(b"depth" + frame.encode())
+    (src / "sh010_v003.mov").write_bytes(b"mov")
+    return src
+
+
+def list_tree(root):
+    return sorted(
+        os.path.relpath(os.path.join(folder, name), root).replace(os.sep, "/")
+        for folder, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def test_local_copy_filters_and_renames(make_plugin, sequence, monkeypatch):
+    monkeypatch.setattr(Config, "DESTINATION_BACKEND", "local")
+    monkeypatch.setattr(Config, "FILE_NAME_TEMPLATE", "{name}.{frame}{ext}")
+    plugin = make_plugin()
+
+    export_folder = plugin.get_export_folder({})
+    target = plugin.copy_files(str(sequence), os.path.join(export_folder, "250101_"), "CLIENT")
+
+    assert target == os.path.normpath(os.path.join(export_folder, "250101_", "CLIENT"))
+    assert list_tree(target) == [
+        "CLIENT.0001.exr",
+        "CLIENT.0002.exr",
+        "CLIENT.mov",
+        "CLIENT_1.0001.exr",
+        "CLIENT_1.0002.exr",
+    ]
+    with open(os.path.join(target, "CLIENT_1.0002.exr"), "rb") as fl:
+        assert fl.read() == b"depth0002"
+    assert plugin.get_existing_folders(export_folder) == ["250101_"]
+
+
+def test_local_copy_keeps_names_without_template(make_plugin, sequence, monkeypatch):
+    monkeypatch.setattr(Config, "DESTINATION_BACKEND", "local")
+    monkeypatch.setattr(Config, "FILE_NAME_TEMPLATE", None)
+    plugin = make_plugin()
+
+    export_folder = plugin.get_export_folder({})
+    target = plugin.copy_files(str(sequence), export_folder, "CLIENT")
+
+    assert os.path.basename(target) == "CLIENT"
+    assert "versioninfo.json" not in list_tree(target)
+    assert "beauty.0001.exr" in list_tree(target)
+
+
+def test_local_copy_single_file(make_plugin, sequence, monkeypatch):
+    monkeypatch.setattr(Config, "DESTINATION_BACKEND", "local")
+    plugin = make_plugin()
+
+    export_folder = plugin.get_export_folder({})
+    target = plugin.copy_files(str(sequence / "sh010_v003.mov"), export_folder, "CLIENT")
+
+    assert os.path.basename(target) == "CLIENT.mov"
+    assert os.path.isfile(target)
+
+
+class RecordingBackend(DestinationBackend):
+    def __init__(self, workers, barrier=None):
+        DestinationBackend.__init__(self, workers)
+        self.barrier = barrier
+        self.sent = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def put_file(self, src, dst):
+        if self.barrier:
+            # only passes if the workers run at the same time
+            self.barrier.wait()
+        with self.lock:
+            self.sent.append((src, dst))
+            self.threads.add(threading.get_ident())
+
+
+def test_put_files_runs_the_workers_concurrently():
+    backend = RecordingBackend(4, threading.Barrier(4, timeout=5))
+    files = [(f"src/{i}", f"dst/{i}") for i in range(20)]
+
+    backend.put_files(files)
+
+    assert sorted(backend.sent) == sorted(files)
+    assert len(backend.threads) == 4
+
+
+def test_put_files_raises_the_upload_errors():
+    class FailingBackend(RecordingBackend):
+        def put_file(self, src, dst):
+            if src == "src/3":
+                raise IOError("disk full")
+
+    with pytest.raises(IOError):
+        FailingBackend(4).put_files([(f"src/{i}", f"dst/{i}") for i in range(8)])
+
+
+class FakeTransport(object):
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+
+class FakeSSH(object):
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.closed = False
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSFTP(object):
+    def __init__(self):
+        self.fail = False
+        self.closed = False
+        self.stats = []
+
+    def stat(self, path):
+        self.stats.append(path)
+
+    def listdir_attr(self, path):
+        if self.fail:
+            raise EOFError()
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sftp_backend(monkeypatch):
+    monkeypatch.setattr(DestinationBackends, "paramiko", types.SimpleNamespace())
+    backend = SFTPBackend("localhost", root="/upload")
+    backend.sessions = []
+
+    def connect():
+        session = (FakeSSH(), FakeSFTP())
+        backend.sessions.append(session)
+        return session
+
+    backend._connect = connect
+    return backend
+
+
+def test_sftp_session_is_reused(sftp_backend):
+    sftp_backend.list_folders("/upload")
+    sftp_backend.list_folders("/upload")
+
+    assert len(sftp_backend.sessions) == 1
+
+
+def test_sftp_broken_session_is_dropped(sftp_backend):
+    sftp_backend.list_folders("/upload")
+    ssh, sftp = sftp_backend.sessions[0]
+    sftp.fail = True
+
+    with pytest.raises(EOFError):
+        sftp_backend.list_folders("/upload")
+    assert ssh.closed and sftp.closed
+
+    sftp_backend.list_folders("/upload")
+    assert len(sftp_backend.sessions) == 2
+
+
+def test_sftp_inactive_session_is_not_reused(sftp_backend):
+    sftp_backend.list_folders("/upload")
+    ssh, sftp = sftp_backend.sessions[0]
+    # e.g. closed by the server idle timeout
+    ssh.transport.active = False
+
+    sftp_backend.list_folders("/upload")
+
+    assert ssh.closed
+    assert len(sftp_backend.sessions) == 2
+
+
+def test_sftp_created_folders_are_checked_again_each_delivery(sftp_backend):
+    sftp_backend.makedirs("/upload/250101_")
+    sftp_backend.makedirs("/upload/250101_")
+    sftp = sftp_backend.sessions[0][1]
+    assert sftp.stats == ["/upload", "/upload/250101_"]
+
+    sftp_backend.start_delivery()
+    sftp_backend.makedirs("/upload/250101_")
+    assert sftp.stats == ["/upload", "/upload/250101_"] * 2
+
+
+def test_unreachable_destination_lists_no_folder(make_plugin, monkeypatch):
+    plugin = make_plugin()
+    popups = []
+    plugin.core.popup = lambda text, **kwargs: popups.append(text)
+
+    class Unreachable(RecordingBackend):
+        def list_folders(self, path):
+            raise TimeoutError("timed out")
+
+    plugin.destination = Unreachable(1)
+
+    assert plugin.get_existing_folders("/upload") == []
+    assert len(popups) == 1
+
+
+# Opt-in tests against a local stand-in server, e.g.
+#   S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET=test S3_ACCESS_KEY=minioadmin S3_SECRET_KEY=minioadmin
+#   SFTP_HOST=localhost SFTP_PORT=2222 SFTP_USERNAME=foo SFTP_PASSWORD=pass SFTP_ROOT=/upload SFTP_KNOWN_HOSTS=...
+# UPLOAD_WORKERS=1 for a stand-in server accepting one connection at a time.
+
+def use_env_workers(monkeypatch):
+    monkeypatch.setattr(Config, "UPLOAD_WORKERS", int(os.environ.get("UPLOAD_WORKERS", Config.UPLOAD_WORKERS)))
+
+
+@pytest.mark.skipif(not os.environ.get("S3_ENDPOINT_URL"), reason="S3_ENDPOINT_URL is not set")
+def test_s3_copy(make_plugin, sequence, monkeypatch):
+    pytest.importorskip("boto3")
+    monkeypatch.setattr(Config, "DESTINATION_BACKEND", "s3")
+    use_env_workers(monkeypatch)
+    monkeypatch.setattr(Config, "FILE_NAME_TEMPLATE", "{name}.{frame}{ext}")
+    monkeypatch.setattr(Config, "S3_ENDPOINT_URL", os.environ["S3_ENDPOINT_URL"])
+    monkeypatch.setattr(Config, "S3_BUCKET", os.environ.get("S3_BUCKET", "test"))
+    monkeypatch.setattr(Config, "S3_PREFIX", f"tests/{uuid.uuid4().hex}")
+    monkeypatch.setattr(Config, "S3_ACCESS_KEY", os.environ.get("S3_ACCESS_KEY"))
+    monkeypatch.setattr(Config, "S3_SECRET_KEY", os.environ.get("S3_SECRET_KEY"))
+    monkeypatch.setattr(Config, "S3_REGION", os.environ.get("S3_REGION"))
+    plugin = make_plugin()
+
+    export_folder = plugin.get_export_folder({})
+    plugin.copy_files(str(sequence), f"{export_folder}/250101_", "CLIENT")
+
+    destination = plugin.get_destination()
+    assert destination.list_folders(export_folder) == ["250101_"]
+    response = destination.client.list_objects_v2(
+        Bucket=Config.S3_BUCKET, Prefix=f"{export_folder}/250101_/CLIENT/"
+        )
+    keys = sorted(obj["Key"].rsplit("/", 1)[1] for obj in response.get("Contents", []))
+    assert keys == ["CLIENT.0001.exr", "CLIENT.0002.exr", "CLIENT.mov", "CLIENT_1.0001.exr", "CLIENT_1.0002.exr"]
+
+
+@pytest.mark.skipif(not os.environ.get("SFTP_HOST"), reason="SFTP_HOST is not set")
+def test_sftp_copy(make_plugin, sequence, monkeypatch):
+    pytest.importorskip("paramiko")
+    monkeypatch.setattr(Config, "DESTINATION_BACKEND", "sftp")
+    use_env_workers(monkeypatch)
+    monkeypatch.setattr(Config, "FILE_NAME_TEMPLATE", "{name}.{frame}{ext}")
+    monkeypatch.setattr(Config, "SFTP_HOST", os.environ["SFTP_HOST"])
+    monkeypatch.setattr(Config, "SFTP_PORT", int(os.environ.get("SFTP_PORT", 22)))
+    monkeypatch.setattr(Config, "SFTP_USERNAME", os.environ.get("SFTP_USERNAME"))
+    monkeypatch.setattr(Config, "SFTP_PASSWORD", os.environ.get("SFTP_PASSWORD"))
+    monkeypatch.setattr(Config, "SFTP_KEY_FILENAME", os.environ.get("SFTP_KEY_FILENAME"))
+    monkeypatch.setattr(Config, "SFTP_KNOWN_HOSTS", os.environ.get("SFTP_KNOWN_HOSTS"))
+    monkeypatch.setattr(
+        Config, "SFTP_ROOT", f"{os.environ.get('SFTP_ROOT', '/upload')}/{uuid.uuid4().hex}"
+        )
+    plugin = make_plugin()
+
+    export_folder = plugin.get_export_folder({})
+    target = plugin.copy_files(str(sequence), f"{export_folder}/250101_", "CLIENT")
+
+    destination = plugin.get_destination()
+    assert destination.list_folders(export_folder) == ["250101_"]
+    with destination._session() as sftp:
+        names = sorted(sftp.listdir(target))
+    assert names == ["CLIENT.0001.exr", "CLIENT.0002.exr", "CLIENT.mov", "CLIENT_1.0001.exr", "CLIENT_1.0002.exr"]
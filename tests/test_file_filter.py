@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from FileFilter import FileFilter
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / "_thumbs").mkdir()
+    (tmp_path / "renders").mkdir()
+    (tmp_path / "beauty.0001.exr").write_bytes(b"x" * 10)
+    (tmp_path / "beauty.0002.EXR").write_bytes(b"x" * 100)
+    (tmp_path / "preview.jpg").write_bytes(b"x")
+    (tmp_path / "versioninfo.json").write_text("{}")
+    return tmp_path
+
+
+def accepted(file_filter, folder):
+    with os.scandir(folder) as entries:
+        return sorted(entry.name for entry in entries if file_filter.accept(entry))
+
+
+def test_no_rule_accepts_everything(folder):
+    assert accepted(FileFilter(), folder) == [
+        "_thumbs", "beauty.0001.exr", "beauty.0002.EXR", "preview.jpg", "renders", "versioninfo.json"
+    ]
+
+
+def test_include_patterns_only_filter_files(folder):
+    file_filter = FileFilter(include_patterns=["*.exr"])
+    assert accepted(file_filter, folder) == ["_thumbs", "beauty.0001.exr", "beauty.0002.EXR", "renders"]
+
+
+def test_exclude_patterns_filter_files_and_folders(folder):
+    file_filter = FileFilter(exclude_patterns=["versioninfo.json", "render*"])
+    assert "versioninfo.json" not in accepted(file_filter, folder)
+    assert "renders" not in accepted(file_filter, folder)
+
+
+def test_exclude_folders_keep_files_with_the_same_name(folder):
+    (folder / "_thumbs.txt").write_text("")
+    file_filter = FileFilter(exclude_folders=["_thumbs*"])
+    names = accepted(file_filter, folder)
+    assert "_thumbs" not in names
+    assert "_thumbs.txt" in names
+
+
+def test_extensions_are_case_insensitive(folder):
+    assert accepted(FileFilter(include_extensions=[".EXR"]), folder) == [
+        "_thumbs", "beauty.0001.exr", "beauty.0002.EXR", "renders"
+    ]
+    assert "preview.jpg" not in accepted(FileFilter(exclude_extensions=["JPG"]), folder)
+
+
+def test_size_limits(folder):
+    file_filter = FileFilter(include_extensions=["exr"], min_size=5, max_size=50)
+    assert accepted(file_filter, folder) == ["_thumbs", "beauty.0001.exr", "renders"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="needs symlinks")
+def test_broken_link_is_skipped(folder):
+    os.symlink(folder / "missing.exr", folder / "broken.exr")
+    assert "broken.exr" not in accepted(FileFilter(), folder)
+    assert "broken.exr" not in accepted(FileFilter(max_size=1000), folder)
+
+
+def test_copy_skips_empty_folders_and_keeps_folder_times(make_plugin, folder, monkeypatch):
+    from env import Config
+
+    monkeypatch.setattr(Config, "DESTINATION_BACKEND", "local")
+    monkeypatch.setattr(Config, "FILE_NAME_TEMPLATE", None)
+    monkeypatch.setattr(Config, "INCLUDE_EXTENSIONS", ["exr"])
+    (folder / "renders" / "preview.jpg").write_bytes(b"x")
+    (folder / "layers").mkdir()
+    (folder / "layers" / "depth.0001.exr").write_bytes(b"x")
+    os.utime(folder / "layers", (1000000000, 1000000000))
+    plugin = make_plugin()
+
+    target = plugin.copy_files(str(folder), plugin.get_export_folder({}), "CLIENT")
+
+    assert sorted(os.listdir(target)) == ["beauty.0001.exr", "beauty.0002.EXR", "layers"]
+    assert os.stat(os.path.join(target, "layers")).st_mtime == 1000000000
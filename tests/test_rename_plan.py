@@ -0,0 +1,85 @@
+import types
+
+import pytest
+
+from RenamePlan import RenamePlan
+
+
+def names(plan, file_names, name="CLIENT", case_sensitive=True):
+    files = [(f"src/{file_name}", "dst", file_name) for file_name in file_names]
+    return sorted(target for _, _, target in plan.resolve(files, name, case_sensitive))
+
+
+@pytest.fixture
+def plan():
+    return RenamePlan("{name}.{frame}{ext}")
+
+
+def test_sequences_keep_their_frames(plan):
+    assert names(plan, ["beauty.0001.exr", "beauty.0002.exr"]) == ["CLIENT.0001.exr", "CLIENT.0002.exr"]
+
+
+def test_colliding_sequence_gets_the_suffix_on_the_name(plan):
+    assert names(plan, ["beauty.0001.exr", "beauty.0002.exr", "depth.0001.exr", "depth.0002.exr"]) == [
+        "CLIENT.0001.exr", "CLIENT.0002.exr", "CLIENT_1.0001.exr", "CLIENT_1.0002.exr"
+    ]
+
+
+def test_lone_file_digits_are_not_a_frame(plan):
+    assert names(plan, ["sh010_v003.mov"]) == ["CLIENT.mov"]
+    assert names(plan, ["notes_2.txt"]) == ["CLIENT.txt"]
+    assert names(plan, ["CLIENT_1.mov"]) == ["CLIENT.mov"]
+
+
+def test_lone_files_get_a_suffix(plan):
+    assert names(plan, ["a.txt", "b.txt"]) == ["CLIENT.txt", "CLIENT_1.txt"]
+
+
+def test_collisions_differing_by_case(plan):
+    assert names(plan, ["a.txt", "b.TXT"], case_sensitive=True) == ["CLIENT.TXT", "CLIENT.txt"]
+    assert names(plan, ["a.txt", "b.TXT"], case_sensitive=False) == ["CLIENT.txt", "CLIENT_1.TXT"]
+
+
+def test_suffix_skips_used_names(plan):
+    assert names(plan, ["a.txt", "b.txt", "c.txt", "d.txt"]) == [
+        "CLIENT.txt", "CLIENT_1.txt", "CLIENT_2.txt", "CLIENT_3.txt"
+    ]
+
+
+def test_frame_padding():
+    plan = RenamePlan("{name}.{frame}{ext}", frame_padding=4)
+    assert names(plan, ["a.1.exr", "a.2.exr"]) == ["CLIENT.0001.exr", "CLIENT.0002.exr"]
+
+
+def test_frame_padding_collision_raises():
+    plan = RenamePlan("{name}.{frame}{ext}", frame_padding=4)
+    with pytest.raises(ValueError, match="same name"):
+        names(plan, ["a.1.exr", "a.0001.exr"])
+
+
+def test_mixed_separators_with_the_same_frame_raise(plan):
+    with pytest.raises(ValueError, match="same name"):
+        names(plan, ["a.0001.exr", "a_0001.exr"])
+
+
+def test_template_without_name_can_not_be_suffixed():
+    plan = RenamePlan("{stem}.{frame}{ext}", template_no_frame="delivery{ext}")
+    with pytest.raises(ValueError, match="Can't find a free name"):
+        names(plan, ["a.txt", "b.txt"])
+
+
+@pytest.mark.parametrize("template", ["{nam}.{frame}{ext}", "{name}.{}{ext}", "{name}.{frame:q}{ext}", "{name"])
+def test_invalid_template_raises(template):
+    with pytest.raises(ValueError, match="Invalid file name template"):
+        RenamePlan(template)
+
+
+def test_from_config_checks_the_templates():
+    config = types.SimpleNamespace(
+        FILE_NAME_TEMPLATE="{name}.{frame}{ext}", FILE_NAME_TEMPLATE_NO_FRAME="{nam}{ext}", FRAME_PADDING=None
+    )
+    with pytest.raises(ValueError, match="nam"):
+        RenamePlan.from_config(config)
+
+    config.FILE_NAME_TEMPLATE = None
+    assert RenamePlan.from_config(config) is None